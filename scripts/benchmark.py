@@ -0,0 +1,284 @@
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import generate_charts as gc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+SYNTH_DIR = os.path.join(gc.ROOT, "data", "synthetic")
+BASELINE_PATH = os.path.join(gc.ROOT, "benchmark_baseline.json")
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+
+# A stage whose time grows faster than rows ** CLIFF_EXPONENT is flagged
+CLIFF_EXPONENT = 1.2
+
+
+def peak_rss_mb():
+    """Process peak RSS, or None where neither resource nor psutil is available."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes on Linux
+        return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        # peak_wset is Windows' peak working set; elsewhere fall back to current RSS
+        return getattr(info, "peak_wset", info.rss) / 2**20
+    return None
+
+
+def synthetic_paths(rows, seed):
+    """Synthetic (transport, home) CSVs for ``rows`` total listings, generated once.
+
+    Each category gets its own child of ``seed`` so the two datasets are
+    independent rather than drawn from the same random stream.
+    """
+    import numpy as np
+    import synth_listings
+
+    folder = os.path.join(SYNTH_DIR, f"{rows}-seed{seed}-v{synth_listings.VERSION}")
+    category_seeds = np.random.SeedSequence(seed).spawn(2)
+    paths = {}
+    for (category, share), category_seed in zip(
+            [("transport", rows // 2), ("home", rows - rows // 2)], category_seeds):
+        path = os.path.join(folder, f"{category}.csv")
+        if not os.path.exists(path):
+            print(f"  generating {share:,} {category} rows -> {path}", file=sys.stderr)
+            synth_listings.write_csv(path + ".tmp", share, category, seed=category_seed)
+            os.replace(path + ".tmp", path)
+        paths[category] = path
+    return paths["transport"], paths["home"]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# one size — runs in its own process so peak RSS is per size
+# ══════════════════════════════════════════════════════════════════════════════
+def run_size(transport_path, home_path, trace_memory=False):
+    """Time each stage; with ``trace_memory``, also its peak Python/numpy
+    allocation via tracemalloc. Tracing inflates the timings of
+    allocation-heavy stages, so run_sizes() only keeps memory from a traced
+    run and takes wall times from an untraced one."""
+    stages = {}
+
+    @contextlib.contextmanager
+    def stage(name):
+        entry = stages.setdefault(name, {})
+        if trace_memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        yield entry
+        entry["wall_s"] = time.perf_counter() - start
+        if trace_memory:
+            entry["peak_alloc_mb"] = (tracemalloc.get_traced_memory()[1] - before) / 2**20
+
+    gc._import_heavy()
+    if trace_memory:
+        tracemalloc.start()
+    with stage("load"):
+        tr, ho = gc.load_data(transport_path, home_path)
+    # import / read_csv / dedupe / datetimes breakdown, as timed by generate_charts
+    for name, secs in gc.STARTUP.items():
+        stages[name] = {"wall_s": secs}
+
+    savefig_s = []
+    save_chart = gc.save_chart
+
+    def timed_save(fig, filename, out=None):
+        t = time.perf_counter()
+        save_chart(fig, filename, out)
+        savefig_s.append(time.perf_counter() - t)
+
+    gc.save_chart = timed_save
+    for name, (chart, _) in gc.CHARTS.items():
+        savefig_s.clear()
+        try:
+            with stage(f"chart {name}") as entry:
+                chart(tr, ho, out=io.BytesIO())
+        except Exception as e:
+            stages[f"chart {name}"] = {"error": repr(e)}
+            continue
+        entry["savefig_s"] = sum(savefig_s)
+    gc.save_chart = save_chart
+    tracemalloc.stop()
+
+    return {
+        "listings": int(len(tr) + len(ho)),
+        "stages": stages,
+        "peak_rss_mb": peak_rss_mb(),
+        "trace_memory": trace_memory,
+    }
+
+
+def run_child(transport_path, home_path, trace_memory):
+    """run_size() in a fresh process; an error dict if the child dies."""
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", transport_path, home_path]
+        + (["--trace-memory"] if trace_memory else []),
+        stdout=subprocess.PIPE, text=True,
+    )
+    if proc.returncode != 0:
+        # negative return codes are signals, e.g. -9 when the OOM killer steps in
+        return {"error": f"child exited with code {proc.returncode}"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def merge_memory(timed, traced):
+    """Copy per-stage peak_alloc_mb from a traced run onto the untraced one."""
+    for name, stage in traced["stages"].items():
+        if "peak_alloc_mb" in stage and name in timed["stages"]:
+            timed["stages"][name]["peak_alloc_mb"] = stage["peak_alloc_mb"]
+    timed["trace_memory"] = True
+
+
+def run_sizes(sizes, seed, output, trace_memory=True):
+    """Run each size in turn, rewriting the baseline after every one so a
+    crash (e.g. an OOM kill at 10M) keeps the smaller sizes' results.
+
+    Timings and peak RSS come from an untraced child; with ``trace_memory``
+    a second, traced child supplies the per-stage allocation peaks.
+    """
+    runs = []
+    for rows in sizes:
+        print(f"\n{rows:,} rows", file=sys.stderr)
+        try:
+            transport_path, home_path = synthetic_paths(rows, seed)
+        except (OSError, MemoryError) as e:
+            runs.append({"rows": rows, "error": f"generating data failed: {e!r}"})
+            write_baseline(output, runs, seed)
+            continue
+        start = time.perf_counter()
+        result = run_child(transport_path, home_path, trace_memory=False)
+        result["rows"] = rows
+        result["wall_s"] = time.perf_counter() - start
+        if "error" in result:
+            print(f"  failed: {result['error']}", file=sys.stderr)
+        else:
+            print(f"  {result['wall_s']:.1f} s", file=sys.stderr)
+            if trace_memory:
+                traced = run_child(transport_path, home_path, trace_memory=True)
+                if "error" in traced:
+                    result["trace_error"] = traced["error"]
+                    print(f"  traced run failed: {traced['error']}", file=sys.stderr)
+                else:
+                    merge_memory(result, traced)
+        runs.append(result)
+        add_scaling(runs)
+        write_baseline(output, runs, seed)
+    return runs
+
+
+def write_baseline(path, runs, seed):
+    baseline = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {"platform": platform.platform(), "cpus": os.cpu_count(), **_versions()},
+        "seed": seed,
+        "runs": runs,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2)
+
+
+def add_scaling(runs):
+    """Annotate each stage with its empirical exponent vs the previous size."""
+    runs = [run for run in runs if "error" not in run]
+    for prev, cur in zip(runs, runs[1:]):
+        growth = math.log(cur["rows"] / prev["rows"])
+        for name, stage in cur["stages"].items():
+            if name.startswith("import"):
+                continue
+            before = prev["stages"].get(name, {}).get("wall_s")
+            if stage.get("wall_s") and before:
+                exponent = math.log(stage["wall_s"] / before) / growth
+                stage["exponent"] = round(exponent, 2)
+                stage["cliff"] = exponent > CLIFF_EXPONENT
+
+
+def print_report(runs):
+    names = list(dict.fromkeys(name for run in runs for name in run.get("stages", {})))
+    header = f"{'stage':<44}" + "".join(f"{run['rows']:>14,}" for run in runs)
+    print(header)
+    print("─" * len(header))
+    for name in names:
+        cells = []
+        for run in runs:
+            stage = run.get("stages", {}).get(name, {})
+            if "error" in run:
+                cells.append(f"{'failed':>14}")
+            elif "error" in stage:
+                cells.append(f"{'error':>14}")
+            elif "wall_s" in stage:
+                flag = " !" if stage.get("cliff") else "  "
+                cells.append(f"{stage['wall_s'] * 1000:>10.0f}ms{flag}")
+            else:
+                cells.append(f"{'':>14}")
+        print(f"{name:<44}" + "".join(cells))
+
+    if any(run.get("trace_memory") for run in runs):
+        print(f"\n{'peak allocation per stage (MB)':<44}")
+        for name in names:
+            peaks = [run.get("stages", {}).get(name, {}).get("peak_alloc_mb") for run in runs]
+            if any(p is not None for p in peaks):
+                print(f"{name:<44}" + "".join(
+                    f"{p:>14.1f}" if p is not None else f"{'':>14}" for p in peaks))
+    print(f"{'peak RSS (MB)':<44}" + "".join(
+        f"{'failed':>14}" if "error" in run
+        else f"{'n/a':>14}" if run.get("peak_rss_mb") is None
+        else f"{run['peak_rss_mb']:>14.0f}"
+        for run in runs))
+    for run in runs:
+        if "error" in run:
+            print(f"{run['rows']:,} rows failed: {run['error']}")
+    print(f"\n! = time grew faster than rows^{CLIFF_EXPONENT} since the previous size")
+
+
+def _versions():
+    versions = {"python": platform.python_version()}
+    for module in ("numpy", "pandas", "matplotlib"):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            pass
+    return versions
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding="utf-8")
+    parser = argparse.ArgumentParser(
+        description="Time load, dedupe and every chart on synthetic data at growing sizes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="total listings per run, split evenly between categories")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=BASELINE_PATH, help="where to write the JSON baseline")
+    parser.add_argument("--no-trace-memory", dest="trace_memory", action="store_false",
+                        help="skip the second, traced run that measures per-stage memory")
+    parser.add_argument("--trace-memory", dest="child_trace", action="store_true",
+                        help=argparse.SUPPRESS)
+    parser.add_argument("--child", nargs=2, metavar=("TRANSPORT", "HOME"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_size(*args.child, trace_memory=args.child_trace)))
+        sys.exit()
+
+    runs = run_sizes(sorted(args.sizes), args.seed, args.output, args.trace_memory)
+    print()
+    print_report(runs)
+    print(f"\nBaseline saved -> {os.path.abspath(args.output)}")
@@ -1,32 +1,147 @@
+import time
+
+_T0 = time.perf_counter()
+
+import argparse
+import contextlib
+import functools
 import os
 import sys
 import warnings
-import pandas as pd
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
 
 warnings.filterwarnings("ignore")
-sys.stdout.reconfigure(encoding="utf-8")
+
+# pandas and matplotlib are imported on first use (see _import_heavy) so that
+# importing this module stays cheap.
+np = pd = plt = mticker = None
 
 # ── paths ──────────────────────────────────────────────────────────────────────
 _HERE = os.path.dirname(os.path.abspath(__file__))
 ROOT = os.path.join(_HERE, "..")
 CHARTS_DIR = os.path.join(ROOT, "charts")
-os.makedirs(CHARTS_DIR, exist_ok=True)
 
-# ── load & deduplicate ─────────────────────────────────────────────────────────
-tr_raw = pd.read_csv(os.path.join(ROOT, "data", "transport.csv"))
-ho_raw = pd.read_csv(os.path.join(ROOT, "data", "home.csv"))
+TRANSPORT_CSV = os.path.join(ROOT, "data", "transport.csv")
+HOME_CSV = os.path.join(ROOT, "data", "home.csv")
+# Dated rates (AZN per unit of currency); the latest row on or before a
+# listing's creation day applies
+FX_RATES_CSV = os.path.join(ROOT, "data", "fx_rates.csv")
+BASE_CURRENCY = "AZN"
+
+# Inputs used when a chart is called without explicit frames; see set_data_paths()
+DATA_PATHS = {"transport": TRANSPORT_CSV, "home": HOME_CSV}
+
+# Only the fields the charts and report server read (skips e.g. description)
+LOAD_COLUMNS = [
+    "id", "price", "currency", "city", "is_vip", "created_time",
+    "category_id", "user_id", "images_count",
+]
+
+# ── startup profiling ──────────────────────────────────────────────────────────
+STARTUP = {}  # phase name → seconds
+
+
+@contextlib.contextmanager
+def _phase(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP[name] = STARTUP.get(name, 0.0) + time.perf_counter() - start
+
+
+def _import_heavy():
+    global np, pd, plt, mticker
+    if pd is not None:
+        return
+    with _phase("import pandas"):
+        import numpy
+        import pandas
+    with _phase("import matplotlib"):
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot
+        import matplotlib.ticker
+    np, pd, plt, mticker = numpy, pandas, matplotlib.pyplot, matplotlib.ticker
 
-tr = tr_raw.drop_duplicates(subset="id", keep="first").copy()
-ho = ho_raw.drop_duplicates(subset="id", keep="first").copy()
 
-for df in [tr, ho]:
-    df["created_dt"] = pd.to_datetime(df["created_time"], unit="s")
-    df["year"] = df["created_dt"].dt.year
-    df["ym"] = df["created_dt"].dt.strftime("%Y-%m")
+# ── load & deduplicate ─────────────────────────────────────────────────────────
+def load_dataset(path):
+    _import_heavy()
+    name = os.path.basename(path)
+    with _phase(f"load {name}: read_csv"):
+        df = pd.read_csv(path, usecols=lambda c: c in LOAD_COLUMNS)
+    with _phase(f"load {name}: dedupe"):
+        df = df.drop_duplicates(subset="id", keep="first").copy()
+    with _phase(f"load {name}: datetimes"):
+        df["created_dt"] = pd.to_datetime(df["created_time"], unit="s")
+        df["year"] = df["created_dt"].dt.year
+        df["ym"] = df["created_dt"].dt.to_period("M").astype(str)
+    with _phase(f"load {name}: fx normalize"):
+        df["price_azn"] = normalize_prices(df, load_fx_rates(FX_RATES_CSV))
+    return df
+
+
+# ── currency normalisation ─────────────────────────────────────────────────────
+@functools.lru_cache(maxsize=4)
+def load_fx_rates(path=FX_RATES_CSV):
+    """{currency: (sorted days, AZN per unit)} from the dated FX table."""
+    _import_heavy()
+    fx = pd.read_csv(path, parse_dates=["date"]).sort_values(["currency", "date"])
+    return {
+        currency: (g["date"].to_numpy().astype("datetime64[D]"),
+                   g["azn_per_unit"].to_numpy(dtype=float))
+        for currency, g in fx.groupby("currency")
+    }
+
+
+def normalize_prices(df, rates):
+    """Prices in BASE_CURRENCY, as-of joined on creation day; NaN if no rate exists.
+
+    Works a whole currency at a time: searchsorted over the sorted rate dates
+    finds each listing's rate, so there is no per-row Python.
+    """
+    price = df["price"].to_numpy(dtype=float)
+    currency = df["currency"].to_numpy()
+    days = df["created_dt"].to_numpy().astype("datetime64[D]")
+
+    out = np.full(len(df), np.nan)
+    base = currency == BASE_CURRENCY
+    out[base] = price[base]
+    for code, (dates, values) in rates.items():
+        mask = currency == code
+        if not mask.any():
+            continue
+        idx = np.searchsorted(dates, days[mask], side="right") - 1
+        # listings older than the table use its earliest rate
+        out[mask] = price[mask] * values[np.maximum(idx, 0)]
+    return out
+
+
+@functools.lru_cache(maxsize=4)
+def load_data(transport_path=TRANSPORT_CSV, home_path=HOME_CSV):
+    """Load (transport, home) once per pair of paths."""
+    return load_dataset(transport_path), load_dataset(home_path)
+
+
+def set_data_paths(transport_path=None, home_path=None):
+    """Point charts drawn without explicit frames at other CSVs."""
+    if transport_path:
+        DATA_PATHS["transport"] = transport_path
+    if home_path:
+        DATA_PATHS["home"] = home_path
+
+
+def datasets(tr_df=None, ho_df=None):
+    """Frames a chart should draw from, loading the configured CSVs if none are given.
+
+    Also pulls in the plotting stack, since every caller is about to draw.
+    """
+    _import_heavy()
+    if tr_df is None or ho_df is None:
+        tr, ho = load_data(DATA_PATHS["transport"], DATA_PATHS["home"])
+        tr_df = tr if tr_df is None else tr_df
+        ho_df = ho if ho_df is None else ho_df
+    return tr_df, ho_df
 
 # ── style ──────────────────────────────────────────────────────────────────────
 BLUE   = "#2563EB"
@@ -50,10 +165,22 @@ def base_style(ax, title, xlabel="", ylabel=""):
     ax.set_axisbelow(True)
 
 
+def save_chart(fig, filename, out=None):
+    """Write to charts/<filename>, or to ``out`` (a path or file object) if given."""
+    if out is None:
+        os.makedirs(CHARTS_DIR, exist_ok=True)
+    fig.savefig(os.path.join(CHARTS_DIR, filename) if out is None else out,
+                dpi=150, format="png")
+    plt.close(fig)
+    if out is None:
+        print(f"✓  {filename}")
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # CHART 1 — Monthly New Listing Volume  (Jan 2025 → Jan 2026)
 # ══════════════════════════════════════════════════════════════════════════════
-def chart_monthly_volume():
+def chart_monthly_volume(tr=None, ho=None, out=None):
+    tr, ho = datasets(tr, ho)
     months = [f"2025-{m:02d}" for m in range(1, 13)] + ["2026-01"]
 
     tr_vol = tr[tr["ym"].isin(months)].groupby("ym").size().reindex(months, fill_value=0)
@@ -85,15 +212,14 @@ def chart_monthly_volume():
                     color=color, fontweight="bold", fontsize=9, va="center")
 
     fig.tight_layout()
-    fig.savefig(os.path.join(CHARTS_DIR, "01_monthly_volume.png"), dpi=150)
-    plt.close()
-    print("✓  01_monthly_volume.png")
+    save_chart(fig, "01_monthly_volume.png", out)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # CHART 2 — Top Cities by Listing Count
 # ══════════════════════════════════════════════════════════════════════════════
-def chart_city_distribution():
+def chart_city_distribution(tr=None, ho=None, out=None):
+    tr, ho = datasets(tr, ho)
     top_cities_tr = tr["city"].value_counts().head(8)
     top_cities_ho = ho["city"].value_counts().head(8)
 
@@ -118,20 +244,19 @@ def chart_city_distribution():
         ax.set_xlim(0, max(vals) * 1.18)
 
     fig.tight_layout(pad=3)
-    fig.savefig(os.path.join(CHARTS_DIR, "02_city_distribution.png"), dpi=150)
-    plt.close()
-    print("✓  02_city_distribution.png")
+    save_chart(fig, "02_city_distribution.png", out)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # CHART 3 — Price Bracket Distribution
 # ══════════════════════════════════════════════════════════════════════════════
-def chart_price_distribution():
+def chart_price_distribution(tr=None, ho=None, out=None):
+    tr, ho = datasets(tr, ho)
     def bucketize(df, bins, labels):
-        d = df[(df["currency"] == "AZN") & df["price"].notna()].copy()
-        p99 = d["price"].quantile(0.99)
-        d = d[d["price"] <= p99]
-        d["bracket"] = pd.cut(d["price"], bins=bins, labels=labels)
+        d = df[df["price_azn"].notna()].copy()
+        p99 = d["price_azn"].quantile(0.99)
+        d = d[d["price_azn"] <= p99]
+        d["bracket"] = pd.cut(d["price_azn"], bins=bins, labels=labels)
         return d["bracket"].value_counts().reindex(labels, fill_value=0)
 
     tr_b = bucketize(tr,
@@ -157,15 +282,14 @@ def chart_price_distribution():
                     f"{pct:.0f}%", ha="center", fontsize=8, color=SLATE)
 
     fig.tight_layout(pad=3)
-    fig.savefig(os.path.join(CHARTS_DIR, "03_price_distribution.png"), dpi=150)
-    plt.close()
-    print("✓  03_price_distribution.png")
+    save_chart(fig, "03_price_distribution.png", out)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # CHART 4 — Seller Concentration
 # ══════════════════════════════════════════════════════════════════════════════
-def chart_seller_concentration():
+def chart_seller_concentration(tr=None, ho=None, out=None):
+    tr, ho = datasets(tr, ho)
     def seg_counts(df):
         vc = df["user_id"].value_counts()
         return {
@@ -195,15 +319,14 @@ def chart_seller_concentration():
         ax.set_xticklabels(labels, fontsize=8.5)
 
     fig.tight_layout(pad=3)
-    fig.savefig(os.path.join(CHARTS_DIR, "04_seller_segments.png"), dpi=150)
-    plt.close()
-    print("✓  04_seller_segments.png")
+    save_chart(fig, "04_seller_segments.png", out)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # CHART 5 — Inventory Share: Top Sellers vs the Rest
 # ══════════════════════════════════════════════════════════════════════════════
-def chart_inventory_share():
+def chart_inventory_share(tr=None, ho=None, out=None):
+    tr, ho = datasets(tr, ho)
     def top_share(df, tops):
         vc = df["user_id"].value_counts()
         total = len(df)
@@ -236,20 +359,19 @@ def chart_inventory_share():
                 fontweight="bold", color=SLATE)
 
     fig.tight_layout()
-    fig.savefig(os.path.join(CHARTS_DIR, "05_inventory_concentration.png"), dpi=150)
-    plt.close()
-    print("✓  05_inventory_concentration.png")
+    save_chart(fig, "05_inventory_concentration.png", out)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # CHART 6 — Median Asking Price Trend (2022–2025)
 # ══════════════════════════════════════════════════════════════════════════════
-def chart_price_trend():
+def chart_price_trend(tr=None, ho=None, out=None):
+    tr, ho = datasets(tr, ho)
     def yearly_median(df):
-        d = df[(df["currency"] == "AZN") & df["price"].notna() & df["year"].between(2022, 2025)].copy()
-        p99 = d["price"].quantile(0.99)
-        d = d[d["price"] <= p99]
-        return d.groupby("year")["price"].median()
+        d = df[df["price_azn"].notna() & df["year"].between(2022, 2025)].copy()
+        p99 = d["price_azn"].quantile(0.99)
+        d = d[d["price_azn"] <= p99]
+        return d.groupby("year")["price_azn"].median()
 
     tr_trend = yearly_median(tr)
     ho_trend = yearly_median(ho)
@@ -277,22 +399,21 @@ def chart_price_trend():
                             ha="center", fontsize=9, color=color, fontweight="bold")
 
     fig.tight_layout()
-    fig.savefig(os.path.join(CHARTS_DIR, "06_price_trend.png"), dpi=150)
-    plt.close()
-    print("✓  06_price_trend.png")
+    save_chart(fig, "06_price_trend.png", out)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # CHART 7 — VIP vs Regular: Price and Photo Quality
 # ══════════════════════════════════════════════════════════════════════════════
-def chart_vip_comparison():
+def chart_vip_comparison(tr=None, ho=None, out=None):
+    tr, ho = datasets(tr, ho)
     fig, axes = plt.subplots(1, 2, figsize=(13, 5))
 
     # Left: Transport — VIP vs regular median price
-    tr_azn = tr[(tr["currency"] == "AZN") & tr["price"].notna()].copy()
-    p99 = tr_azn["price"].quantile(0.99)
-    tr_azn = tr_azn[tr_azn["price"] <= p99]
-    tr_vip_price = tr_azn.groupby("is_vip")["price"].median()
+    tr_azn = tr[tr["price_azn"].notna()].copy()
+    p99 = tr_azn["price_azn"].quantile(0.99)
+    tr_azn = tr_azn[tr_azn["price_azn"] <= p99]
+    tr_vip_price = tr_azn.groupby("is_vip")["price_azn"].median()
 
     ax = axes[0]
     labels = ["Regular Listings", "VIP Listings"]
@@ -321,15 +442,14 @@ def chart_vip_comparison():
                 fontweight="bold", color=bar.get_facecolor())
 
     fig.tight_layout(pad=3)
-    fig.savefig(os.path.join(CHARTS_DIR, "07_vip_comparison.png"), dpi=150)
-    plt.close()
-    print("✓  07_vip_comparison.png")
+    save_chart(fig, "07_vip_comparison.png", out)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # CHART 8 — Listing Quality: Images per Listing
 # ══════════════════════════════════════════════════════════════════════════════
-def chart_listing_quality():
+def chart_listing_quality(tr=None, ho=None, out=None):
+    tr, ho = datasets(tr, ho)
     fig, axes = plt.subplots(1, 2, figsize=(13, 5))
 
     for ax, df, title, color in [
@@ -352,15 +472,14 @@ def chart_listing_quality():
                 bbox=dict(boxstyle="round,pad=0.4", facecolor="white", edgecolor="#CBD5E1"))
 
     fig.tight_layout(pad=3)
-    fig.savefig(os.path.join(CHARTS_DIR, "08_listing_quality.png"), dpi=150)
-    plt.close()
-    print("✓  08_listing_quality.png")
+    save_chart(fig, "08_listing_quality.png", out)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # CHART 9 — Year-on-Year Listing Volume Growth (2020–2025)
 # ══════════════════════════════════════════════════════════════════════════════
-def chart_yoy_growth():
+def chart_yoy_growth(tr=None, ho=None, out=None):
+    tr, ho = datasets(tr, ho)
     years = list(range(2020, 2026))
     tr_yoy = tr[tr["year"].isin(years)].groupby("year").size().reindex(years, fill_value=0)
     ho_yoy = ho[ho["year"].isin(years)].groupby("year").size().reindex(years, fill_value=0)
@@ -387,23 +506,76 @@ def chart_yoy_growth():
                     fontweight="bold", color=SLATE)
 
     fig.tight_layout()
-    fig.savefig(os.path.join(CHARTS_DIR, "09_yoy_growth.png"), dpi=150)
-    plt.close()
-    print("✓  09_yoy_growth.png")
+    save_chart(fig, "09_yoy_growth.png", out)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# registry — chart name → (function, source columns per dataset)
+# ══════════════════════════════════════════════════════════════════════════════
+# The column lists name the loaded-frame columns each chart reads, so callers
+# (e.g. report_server.py) can tell which charts are affected when data changes.
+CHARTS = {
+    "01_monthly_volume": (chart_monthly_volume,
+                          {"transport": ["created_time"], "home": ["created_time"]}),
+    "02_city_distribution": (chart_city_distribution,
+                             {"transport": ["city"], "home": ["city"]}),
+    "03_price_distribution": (chart_price_distribution,
+                              {"transport": ["price_azn"], "home": ["price_azn"]}),
+    "04_seller_segments": (chart_seller_concentration,
+                           {"transport": ["user_id"], "home": ["user_id"]}),
+    "05_inventory_concentration": (chart_inventory_share,
+                                   {"transport": ["user_id"], "home": ["user_id"]}),
+    "06_price_trend": (chart_price_trend,
+                       {"transport": ["price_azn", "created_time"],
+                        "home": ["price_azn", "created_time"]}),
+    "07_vip_comparison": (chart_vip_comparison,
+                          {"transport": ["price_azn", "is_vip"],
+                           "home": ["is_vip", "images_count"]}),
+    "08_listing_quality": (chart_listing_quality,
+                           {"transport": ["images_count"], "home": ["images_count"]}),
+    "09_yoy_growth": (chart_yoy_growth,
+                      {"transport": ["created_time"], "home": ["created_time"]}),
+}
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # run all
 # ══════════════════════════════════════════════════════════════════════════════
+def print_startup_report(total):
+    print("\nStartup profile:")
+    for name, secs in STARTUP.items():
+        print(f"  {name:<40} {secs * 1000:9.1f} ms")
+    print(f"  {'other (argparse, output, ...)':<40} {(total - sum(STARTUP.values())) * 1000:9.1f} ms")
+    print(f"  {'total':<40} {total * 1000:9.1f} ms")
+
+
 if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding="utf-8")
+    STARTUP["import generate_charts"] = time.perf_counter() - _T0
+
+    parser = argparse.ArgumentParser(description="Render the report charts into charts/.")
+    parser.add_argument("charts", nargs="*", metavar="CHART",
+                        help=f"charts to render (default: all of {', '.join(CHARTS)})")
+    parser.add_argument("--transport", help="transport listings CSV")
+    parser.add_argument("--home", help="home & garden listings CSV")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print time spent importing, loading and rendering")
+    args = parser.parse_args()
+    unknown = [name for name in args.charts if name not in CHARTS]
+    if unknown:
+        parser.error(f"unknown chart(s): {', '.join(unknown)}")
+    set_data_paths(args.transport, args.home)
+
     print("Generating charts...\n")
-    chart_monthly_volume()
-    chart_city_distribution()
-    chart_price_distribution()
-    chart_seller_concentration()
-    chart_inventory_share()
-    chart_price_trend()
-    chart_vip_comparison()
-    chart_listing_quality()
-    chart_yoy_growth()
+    # load up front (each step records its own phase) so that the render
+    # rows below count rendering only
+    _import_heavy()
+    load_data(DATA_PATHS["transport"], DATA_PATHS["home"])
+    for name in args.charts or CHARTS:
+        chart, _ = CHARTS[name]
+        with _phase(f"render {name}"):
+            chart()
     print(f"\nAll charts saved to: {os.path.abspath(CHARTS_DIR)}")
+
+    if args.profile_startup:
+        print_startup_report(time.perf_counter() - _T0)
@@ -4,6 +4,8 @@ import csv
 import os
 import ssl
 
+from listing_schema import CSV_FIELDS
+
 BASE_URL = "https://lalafo.az/api/search/v3/feed/search"
 
 PARAMS_BASE = {
@@ -34,24 +36,6 @@ HEADERS = {
     ),
 }
 
-CSV_FIELDS = [
-    "id",
-    "title",
-    "price",
-    "currency",
-    "city",
-    "views",
-    "is_vip",
-    "is_premium",
-    "url",
-    "created_time",
-    "updated_time",
-    "category_id",
-    "user_id",
-    "images_count",
-    "description",
-]
-
 OUTPUT_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "home.csv")
 
 CONCURRENCY = 5
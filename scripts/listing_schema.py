@@ -0,0 +1,18 @@
+# Columns of data/*.csv, shared by the scrapers and the synthetic generator
+CSV_FIELDS = [
+    "id",
+    "title",
+    "price",
+    "currency",
+    "city",
+    "views",
+    "is_vip",
+    "is_premium",
+    "url",
+    "created_time",
+    "updated_time",
+    "category_id",
+    "user_id",
+    "images_count",
+    "description",
+]
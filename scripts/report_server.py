@@ -0,0 +1,426 @@
+import argparse
+import contextlib
+import hashlib
+import html
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import pandas as pd
+
+import generate_charts as gc
+
+# Unfiltered renders persist here across restarts; filtered ones are memory-only
+CACHE_DIR = os.path.join(gc.CHARTS_DIR, ".cache")
+
+# How many distinct filter combinations to keep in memory
+MAX_FILTERS = 64
+# How many rendered PNGs (chart × filter combination) to keep in memory
+MAX_PNGS = 256
+# A CSV must go this long without being written before it is reloaded, so a
+# scrape that is still appending pages is not picked up half-way
+SETTLE_SECONDS = 5
+# query param → CSV column it filters on
+FILTER_COLUMNS = {
+    "from": "created_time",
+    "to": "created_time",
+    "city": "city",
+    "category": "category_id",
+}
+
+
+class DataUnavailable(Exception):
+    """No dataset could be loaded yet."""
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# data store — datasets, per-chart fingerprints, filtered views, rendered PNGs
+# ══════════════════════════════════════════════════════════════════════════════
+class ReportStore:
+    def __init__(self, sources=None, cache_dir=CACHE_DIR):
+        self.sources = dict(gc.DATA_PATHS if sources is None else sources)
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.RLock()
+        # pyplot keeps global state, so renders are serialised
+        self._render_lock = threading.Lock()
+        self._mtimes = {}
+        self._failed_mtimes = None
+        self.frames = {}
+        self.fingerprints = {}
+        self._column_hashes = {}
+        self._code_version = code_version()
+        self._views = OrderedDict()
+        self._aggregates = OrderedDict()
+        self._pngs = OrderedDict()
+        try:
+            self.refresh()
+        except DataUnavailable as e:
+            print(f"  no data yet ({e}); requests get 503 until it loads")
+
+    # ── invalidation ──────────────────────────────────────────────────────────
+    def refresh(self):
+        """Reload any CSV whose mtime changed and drop charts whose inputs moved.
+
+        A new FX table only recomputes price_azn on the frames in memory.
+        Files still being written are left alone until they settle, and a
+        failed reload keeps serving the last good frames; it only raises
+        when there is nothing loaded yet.
+        """
+        try:
+            mtimes = {name: os.stat(path).st_mtime_ns for name, path in self.sources.items()}
+            mtimes["fx"] = os.stat(gc.FX_RATES_CSV).st_mtime_ns
+        except OSError as e:
+            return self._reload_failed(e)
+        if mtimes == self._mtimes:
+            return []
+        if mtimes == self._failed_mtimes:
+            if not self.frames:
+                raise DataUnavailable("last load failed; waiting for the files to change")
+            return []
+        if self.frames and time.time_ns() - max(mtimes.values()) < SETTLE_SECONDS * 10**9:
+            return []
+        with self._lock:
+            if mtimes == self._mtimes:
+                return []
+            fx_changed = mtimes["fx"] != self._mtimes.get("fx")
+            if fx_changed:
+                gc.load_fx_rates.cache_clear()
+            frames = dict(self.frames)
+            try:
+                rates = gc.load_fx_rates(gc.FX_RATES_CSV) if fx_changed else None
+                for name, path in self.sources.items():
+                    if mtimes[name] != self._mtimes.get(name):
+                        frames[name] = gc.load_dataset(path)
+                    elif fx_changed:
+                        # assign() copies, so views and renders in flight keep the old frame
+                        frames[name] = frames[name].assign(
+                            price_azn=gc.normalize_prices(frames[name], rates))
+                for name, df in frames.items():
+                    missing = required_columns(name) - set(df.columns)
+                    if missing:
+                        raise ValueError(f"{self.sources[name]} lacks {', '.join(sorted(missing))}")
+            except (OSError, KeyError, ValueError) as e:
+                # pandas' ParserError and EmptyDataError are ValueErrors, and
+                # load_dataset raises KeyError for a missing base column;
+                # don't retry until one of the files changes again
+                self._failed_mtimes = mtimes
+                return self._reload_failed(e)
+            self.frames = frames
+            self._mtimes = mtimes
+
+            old_columns = self._column_hashes
+            self._column_hashes = {
+                (dataset, column): hash_column(df[column])
+                for dataset, df in self.frames.items()
+                for column in df.columns
+            }
+            moved = {col for col, h in self._column_hashes.items() if old_columns.get(col) != h}
+            changed = [name for name, (_, inputs) in gc.CHARTS.items()
+                       if any((d, c) in moved for d, cols in inputs.items() for c in cols)]
+            self.fingerprints = {name: self._fingerprint(inputs)
+                                 for name, (_, inputs) in gc.CHARTS.items()}
+
+            self._views.clear()
+            self._aggregates.clear()
+            for key in list(self._pngs):
+                chart, filters, tag = key
+                if tag != self.etag(chart, filters):
+                    del self._pngs[key]
+            self._prune_disk()
+            return changed
+
+    def _reload_failed(self, error):
+        if not self.frames:
+            raise DataUnavailable(str(error)) from error
+        print(f"  reload failed, serving previous data: {error}")
+        return []
+
+    def _prune_disk(self):
+        """Keep only each chart's current unfiltered render on disk, which
+        bounds the directory at one file per chart."""
+        for fname in os.listdir(self.cache_dir):
+            parts = fname.split("-")
+            if len(parts) == 3:
+                chart, fp, tag = parts
+                current = self.fingerprints.get(chart)
+                stale = (current is None or fp != current[:12]
+                         or tag != f"{self.etag(chart, ())}.png")
+            else:
+                stale = True  # not a name chart_png() writes
+            if stale:
+                with contextlib.suppress(OSError):
+                    os.remove(os.path.join(self.cache_dir, fname))
+
+    def _fingerprint(self, inputs):
+        digest = hashlib.sha1(self._code_version.encode())
+        for dataset, columns in sorted(inputs.items()):
+            for column in columns:
+                digest.update(self._column_hashes[(dataset, column)].encode())
+        return digest.hexdigest()
+
+    # ── filtering ─────────────────────────────────────────────────────────────
+    def view(self, filters):
+        """Filtered (transport, home) frames, memoized per filter combination."""
+        with self._lock:
+            if filters in self._views:
+                self._views.move_to_end(filters)
+                return self._views[filters]
+            frames = tuple(apply_filters(self.frames[name], filters)
+                           for name in ("transport", "home"))
+            self._views[filters] = frames
+            if len(self._views) > MAX_FILTERS:
+                self._views.popitem(last=False)
+            return frames
+
+    def aggregates(self, filters):
+        with self._lock:
+            if filters in self._aggregates:
+                self._aggregates.move_to_end(filters)
+                return self._aggregates[filters]
+        tr, ho = self.view(filters)
+        result = {
+            "filters": dict(filters),
+            "transport": summarize(tr),
+            "home": summarize(ho),
+        }
+        with self._lock:
+            self._aggregates[filters] = result
+            if len(self._aggregates) > MAX_FILTERS:
+                self._aggregates.popitem(last=False)
+        return result
+
+    # ── rendering ─────────────────────────────────────────────────────────────
+    def etag(self, chart, filters):
+        """Changes only when the chart's own inputs, or a column it is filtered on, change."""
+        key = self.fingerprints[chart] + json.dumps(filters)
+        for name, _ in filters:
+            for dataset in ("transport", "home"):
+                key += self._column_hashes[(dataset, FILTER_COLUMNS[name])]
+        return hashlib.sha1(key.encode()).hexdigest()[:20]
+
+    def chart_png(self, chart, filters):
+        """(etag, png bytes) — from memory, then disk, rendering only on a miss.
+
+        Only unfiltered renders go to disk: arbitrary ?city=/?from= values
+        would otherwise grow the directory without bound.
+        """
+        tag = self.etag(chart, filters)
+        key = (chart, filters, tag)
+        png = self._cached_png(key)
+        if png is not None:
+            return tag, png
+
+        path = os.path.join(self.cache_dir, f"{chart}-{self.fingerprints[chart][:12]}-{tag}.png")
+        with self._render_lock:
+            # another request may have rendered it while we waited
+            png = self._cached_png(key)
+            if png is not None:
+                return tag, png
+            if not filters and os.path.exists(path):
+                with open(path, "rb") as f:
+                    png = f.read()
+            else:
+                tr, ho = self.view(filters)
+                buf = io.BytesIO()
+                func, _ = gc.CHARTS[chart]
+                func(tr, ho, out=buf)
+                png = buf.getvalue()
+                if not filters:
+                    tmp = f"{path}.tmp"
+                    with open(tmp, "wb") as f:
+                        f.write(png)
+                    os.replace(tmp, path)
+
+            with self._lock:
+                self._pngs[key] = png
+                if len(self._pngs) > MAX_PNGS:
+                    self._pngs.popitem(last=False)
+        return tag, png
+
+    def _cached_png(self, key):
+        with self._lock:
+            png = self._pngs.get(key)
+            if png is not None:
+                self._pngs.move_to_end(key)
+            return png
+
+
+def required_columns(dataset):
+    """Columns the charts, filters and summaries read from a loaded frame."""
+    columns = {c for _, inputs in gc.CHARTS.values() for c in inputs.get(dataset, [])}
+    return columns | set(FILTER_COLUMNS.values()) | set(SUMMARY_COLUMNS)
+
+
+def code_version():
+    """Hash of generate_charts.py and the plotting stack, so code or library
+    upgrades invalidate PNGs rendered by an earlier version."""
+    import matplotlib
+
+    digest = hashlib.sha1()
+    with open(gc.__file__, "rb") as f:
+        digest.update(f.read())
+    digest.update(f"matplotlib {matplotlib.__version__} pandas {pd.__version__}".encode())
+    return digest.hexdigest()
+
+
+def hash_column(series):
+    values = pd.util.hash_pandas_object(series, index=False).values
+    return hashlib.sha1(values.tobytes()).hexdigest()
+
+
+def parse_filters(query):
+    """Normalise query params into a hashable, order-independent filter key."""
+    params = parse_qs(query)
+    filters = []
+    for name in FILTER_COLUMNS:
+        value = (params.get(name) or [""])[0].strip()
+        if not value:
+            continue
+        if name in ("from", "to"):
+            value = pd.Timestamp(value).strftime("%Y-%m-%d")
+        elif name == "category":
+            value = str(int(value))
+        filters.append((name, value))
+    return tuple(filters)
+
+
+def apply_filters(df, filters):
+    if not filters:
+        return df
+    mask = pd.Series(True, index=df.index)
+    for name, value in filters:
+        if name == "from":
+            mask &= df["created_dt"] >= pd.Timestamp(value)
+        elif name == "to":
+            mask &= df["created_dt"] < pd.Timestamp(value) + pd.Timedelta(days=1)
+        elif name == "city":
+            mask &= df["city"] == value
+        elif name == "category":
+            mask &= df["category_id"] == int(value)
+    return df[mask]
+
+
+SUMMARY_COLUMNS = ["price_azn", "user_id", "is_vip", "images_count", "year", "ym", "city"]
+
+
+def summarize(df):
+    azn = df["price_azn"].dropna()
+    return {
+        "listings": int(len(df)),
+        "sellers": int(df["user_id"].nunique()),
+        "median_price_azn": float(azn.median()) if len(azn) else None,
+        "vip_share": float(df["is_vip"].astype(bool).mean()) if len(df) else None,
+        "avg_images": float(df["images_count"].mean()) if len(df) else None,
+        "by_year": {str(k): int(v) for k, v in df.groupby("year").size().items()},
+        "by_month": {k: int(v) for k, v in df.groupby("ym").size().items()},
+        "top_cities": {k: int(v) for k, v in df["city"].value_counts().head(10).items()},
+    }
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# HTTP
+# ══════════════════════════════════════════════════════════════════════════════
+class ReportHandler(BaseHTTPRequestHandler):
+    store = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        try:
+            filters = parse_filters(url.query)
+        except ValueError as e:
+            return self._send(400, "text/plain; charset=utf-8", f"Bad filter: {e}".encode())
+
+        try:
+            self.store.refresh()
+        except DataUnavailable as e:
+            return self._send(503, "text/plain; charset=utf-8",
+                              f"Data not available yet: {e}".encode())
+        except Exception as e:
+            return self._send(500, "text/plain; charset=utf-8",
+                              f"Could not load data: {e}".encode())
+        if url.path == "/":
+            return self._index(filters)
+        if url.path == "/api/charts":
+            body = {name: self.store.etag(name, filters) for name in gc.CHARTS}
+            return self._json(body)
+        if url.path == "/api/aggregates":
+            return self._json(self.store.aggregates(filters))
+        if url.path.startswith("/charts/") and url.path.endswith(".png"):
+            chart = url.path[len("/charts/"):-len(".png")]
+            if chart in gc.CHARTS:
+                return self._chart(chart, filters)
+        self._send(404, "text/plain; charset=utf-8", b"Not found")
+
+    def _chart(self, chart, filters):
+        etag = f'"{self.store.etag(chart, filters)}"'
+        if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+            return self._send(304, None, b"", {"ETag": etag})
+        try:
+            tag, png = self.store.chart_png(chart, filters)
+        except Exception as e:
+            return self._send(500, "text/plain; charset=utf-8",
+                              f"Could not render {chart}: {e}".encode())
+        self._send(200, "image/png", png,
+                   {"ETag": f'"{tag}"', "Cache-Control": "no-cache"})
+
+    def _index(self, filters):
+        query = urlencode(filters)
+        suffix = f"?{query}" if query else ""
+        images = "\n".join(
+            f'<h2>{html.escape(name)}</h2><img src="/charts/{name}.png{html.escape(suffix)}" width="900">'
+            for name in gc.CHARTS
+        )
+        page = (
+            "<!doctype html><meta charset=utf-8><title>Lalafo.az report</title>"
+            "<form>From <input name=from type=date> To <input name=to type=date> "
+            "City <input name=city> Category <input name=category size=6> "
+            "<button>Apply</button></form>"
+            f'<p><a href="/api/aggregates{html.escape(suffix)}">aggregates (JSON)</a></p>'
+            f"{images}"
+        )
+        self._send(200, "text/html; charset=utf-8", page.encode())
+
+    def _json(self, body):
+        self._send(200, "application/json", json.dumps(body, ensure_ascii=False).encode())
+
+    def _send(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    do_HEAD = do_GET
+
+
+def serve(host="127.0.0.1", port=8050):
+    ReportHandler.store = ReportStore()
+    server = ThreadingHTTPServer((host, port), ReportHandler)
+    print(f"Serving report on http://{host}:{port}/  (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve charts and aggregates over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--transport", help="transport listings CSV")
+    parser.add_argument("--home", help="home & garden listings CSV")
+    args = parser.parse_args()
+    gc.set_data_paths(args.transport, args.home)
+    serve(args.host, args.port)
@@ -0,0 +1,166 @@
+import argparse
+import os
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from listing_schema import CSV_FIELDS
+
+# Bump when the generated data changes, so cached benchmark inputs are rebuilt
+VERSION = 2
+
+# Listings are written in chunks of this many rows to bound memory at 10M+
+CHUNK_ROWS = 1_000_000
+
+START_TIME = int(datetime(2020, 1, 1, tzinfo=timezone.utc).timestamp())
+END_TIME = int(datetime(2026, 2, 27, tzinfo=timezone.utc).timestamp())
+
+# Secondary cities (after Baku) in rough order of listing volume; weights decay 1/rank
+OTHER_CITIES = [
+    "Digah", "Gəncə", "Masazır", "Sumqayıt", "Xırdalan", "Mehdiabad", "Lənkəran",
+    "Şəki", "Mingəçevir", "Quba", "Şirvan", "Naxçıvan", "Qəbələ", "Şamaxı",
+    "Zaqatala", "Bərdə", "Ağcabədi", "Salyan", "Qusar", "Xaçmaz", "Biləsuvar",
+    "Göyçay", "Ağdaş", "Astara", "İsmayıllı", "Tovuz", "Şəmkir", "Qazax",
+]
+
+DESCRIPTIONS = np.array([
+    "",
+    "Əla vəziyyətdədir.",
+    "Yeni, qablaşdırmada. Çatdırılma var.",
+    "Orijinal məhsul, zəmanət verilir. Ətraflı məlumat üçün zəng edin.",
+    "Qiymətdə razılaşmaq olar. Bakı daxili çatdırılma pulsuzdur. "
+    "Digər bölgələrə poçtla göndərilir. Hər gün 09:00-dan 21:00-dək zəng edə bilərsiniz.",
+], dtype=object)
+
+# Per-category distributions, loosely fitted to the Feb 2026 scrape (see README)
+PROFILES = {
+    "transport": {
+        "slug": "transport",
+        "category_ids": list(range(1502, 1514)),
+        "baku_share": 0.61,
+        # (weight, median price, log-sigma): parts/accessories vs vehicles
+        "price_mix": [(0.80, 70, 1.3), (0.20, 14_000, 1.0)],
+        "currencies": {"AZN": 0.82, "USD": 0.13, "EUR": 0.05},
+        "vip_share": 0.06,
+    },
+    "home": {
+        "slug": "dom-i-sad",
+        "category_ids": list(range(1424, 1438)),
+        "baku_share": 0.805,
+        "price_mix": [(1.0, 150, 1.1)],
+        "currencies": {"AZN": 0.96, "USD": 0.03, "EUR": 0.01},
+        "vip_share": 0.04,
+    },
+}
+
+# Rough AZN per unit, to quote AZN-drawn prices in the listing's currency
+# (USD is pegged; EUR is about the 2024-25 average in data/fx_rates.csv)
+AZN_PER_UNIT = {"AZN": 1.0, "USD": 1.70, "EUR": 1.90}
+
+MISSING_PRICE_SHARE = 0.04
+DUPLICATE_SHARE = 0.03      # re-listed rows, as seen when pages shift mid-scrape
+LISTINGS_PER_SELLER = 3     # sellers ≈ rows / 3
+SELLER_EXPONENT = 0.9       # seller rank weights ∝ rank ** -SELLER_EXPONENT
+AGE_SCALE_DAYS = 300        # listing age ~ Exp(300 days): recent years dominate
+
+
+def _seller_weights(rows):
+    sellers = max(1, rows // LISTINGS_PER_SELLER)
+    w = np.arange(1, sellers + 1, dtype=np.float64) ** -SELLER_EXPONENT
+    return w / w.sum()
+
+
+def _city_weights(baku_share):
+    w = 1.0 / np.arange(1, len(OTHER_CITIES) + 1)
+    w = w / w.sum() * (1 - baku_share)
+    return np.array(["Bakı"] + OTHER_CITIES, dtype=object), np.concatenate([[baku_share], w])
+
+
+def generate(rows, category="transport", seed=0, first_id=100_000_000, seller_weights=None):
+    """One DataFrame of ``rows`` synthetic listings with the scraper's CSV columns."""
+    profile = PROFILES[category]
+    rng = np.random.default_rng(seed)
+    n_dup = int(rows * DUPLICATE_SHARE)
+    n = rows - n_dup
+
+    if seller_weights is None:
+        seller_weights = _seller_weights(rows)
+    cities, city_p = _city_weights(profile["baku_share"])
+
+    currencies = list(profile["currencies"])
+    currency_idx = rng.choice(len(currencies), size=n, p=list(profile["currencies"].values()))
+    currency = np.array(currencies, dtype=object)[currency_idx]
+
+    # Medians are in AZN; converting into the quoted currency keeps the
+    # AZN-normalised price distribution the same for every currency
+    weights, medians, sigmas = map(np.array, zip(*profile["price_mix"]))
+    component = rng.choice(len(weights), size=n, p=weights / weights.sum())
+    price_azn = rng.lognormal(np.log(medians[component]), sigmas[component])
+    rate = np.array([AZN_PER_UNIT[c] for c in currencies])[currency_idx]
+    price = np.round(price_azn / rate)
+    price[rng.random(n) < MISSING_PRICE_SHARE] = np.nan
+
+    age = rng.exponential(AGE_SCALE_DAYS * 86_400, size=n) % (END_TIME - START_TIME)
+    created = (END_TIME - age).astype(np.int64)
+    updated = np.minimum(created + rng.exponential(20 * 86_400, size=n).astype(np.int64), END_TIME)
+
+    is_vip = rng.random(n) < profile["vip_share"]
+    images = np.clip(rng.poisson(np.where(is_vip, 7.0, 4.0)), 0, 10)
+    images[rng.random(n) < 0.08] = 0
+
+    ids = np.arange(first_id, first_id + n, dtype=np.int64)
+    id_str = pd.Series(ids).astype(str)
+    df = pd.DataFrame({
+        "id": ids,
+        "title": f"{category.title()} elan " + id_str,
+        "price": price,
+        "currency": currency,
+        "city": cities[rng.choice(len(cities), size=n, p=city_p)],
+        "views": rng.lognormal(4.0, 1.2, size=n).astype(np.int64),
+        "is_vip": is_vip,
+        "is_premium": rng.random(n) < 0.03,
+        "url": f"/azerbaijan/{profile['slug']}/ads/elan-id-" + id_str,
+        "created_time": created,
+        "updated_time": updated,
+        "category_id": rng.choice(profile["category_ids"], size=n),
+        "user_id": 10_000_000 + rng.choice(len(seller_weights), size=n, p=seller_weights),
+        "images_count": images,
+        "description": DESCRIPTIONS[rng.integers(0, len(DESCRIPTIONS), size=n)],
+    })
+    if n_dup:
+        df = pd.concat([df, df.iloc[rng.integers(0, n, size=n_dup)]], ignore_index=True)
+    return df[CSV_FIELDS]
+
+
+def write_csv(path, rows, category="transport", seed=0, chunk_rows=CHUNK_ROWS):
+    """Write ``rows`` listings to ``path`` in chunks, each with its own child seed.
+
+    ``seed`` may be an int or a SeedSequence (e.g. one spawned per category).
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    seller_weights = _seller_weights(rows)
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    seeds = seed.spawn(-(-rows // chunk_rows))
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for i, chunk_seed in enumerate(seeds):
+            size = min(chunk_rows, rows - i * chunk_rows)
+            df = generate(size, category, seed=chunk_seed,
+                          first_id=100_000_000 + i * chunk_rows,
+                          seller_weights=seller_weights)
+            df.to_csv(f, header=(i == 0), index=False)
+    return path
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding="utf-8")
+    parser = argparse.ArgumentParser(description="Write synthetic listings shaped like the scraped CSVs.")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--category", choices=list(PROFILES), default="transport")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+    write_csv(args.out, args.rows, args.category, args.seed)
+    print(f"Saved {args.rows} synthetic {args.category} listings -> {os.path.abspath(args.out)}")